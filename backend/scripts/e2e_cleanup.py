@@ -5,21 +5,26 @@ Removes all test data created by seeding scripts.
 
 This script safely removes test users, courses, enrollments, and progress
 created during E2E testing, supporting both local SQLite and cloud databases.
+
+Pass --truncate (or set E2E_FULL_RESET=1) to empty the local user tables
+outright on a dedicated test database.
 """
 import asyncio
 import os
 import sys
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, text
+from supabase import AsyncClient, acreate_client
 from src.core.config import settings
+from src.core.utils import run_async
 from src.core.security import get_password_hash
-from src.db.session import get_db, get_supabase_client
+from src.db.session import get_async_session_factory
 from src.models.user import User
 from src.models.profile import Profile
 from src.models.enrollment import Enrollment
@@ -45,177 +50,168 @@ TEST_COURSE_SLUGS = [
     "python-basics"
 ]
 
+# Deterministic course IDs, matching the ones e2e_seed.py assigns, so the
+# cleanup can delete by primary key
+TEST_COURSE_IDS = tuple(str(uuid.uuid5(uuid.NAMESPACE_DNS, slug)) for slug in TEST_COURSE_SLUGS)
+
+# Local tables emptied by a full reset, children before parents
+FULL_RESET_TABLES = [
+    "user_sessions",
+    "user_activity_logs",
+    "user_lesson_progress",
+    "enrollments",
+    "profiles",
+    "users",
+]
 
-async def cleanup_test_users(db: AsyncSession) -> None:
-    """Remove test users from local database."""
-    print("Cleaning up test users from local database...")
 
-    for email in TEST_USER_EMAILS:
-        try:
-            # Get user ID
-            user_result = await db.execute(
-                select(User.id).where(User.email == email)
-            )
-            user_id = user_result.scalar()
+async def get_test_user_ids(db: AsyncSession) -> List[uuid.UUID]:
+    """Resolve the IDs of all test users in the local database with one query."""
+    try:
+        user_result = await db.execute(
+            select(User.id, User.email).where(User.email.in_(TEST_USER_EMAILS))
+        )
+    except Exception as e:
+        # Handle case where tables don't exist (e.g., no migrations run yet)
+        if "no such table" in str(e).lower():
+            print("Database tables not found, skipping test user lookup")
+            return []
+        raise
 
-            if not user_id:
-                print(f"User {email} not found in local DB, skipping")
-                continue
+    users = user_result.all()
+    found_emails = {email for _, email in users}
+    for email in TEST_USER_EMAILS:
+        if email not in found_emails:
+            print(f"User {email} not found in local DB, skipping")
 
-            # Delete related records first (due to foreign keys)
-            await db.execute(
-                delete(UserSession).where(UserSession.user_id == user_id)
-            )
-            await db.execute(
-                delete(UserActivityLog).where(UserActivityLog.user_id == user_id)
-            )
-            await db.execute(
-                delete(UserLessonProgress).where(UserLessonProgress.user_id == user_id)
-            )
-            await db.execute(
-                delete(Enrollment).where(Enrollment.user_id == user_id)
-            )
+    return [user_id for user_id, _ in users]
 
-            # Delete user and profile
-            await db.execute(delete(Profile).where(Profile.id == user_id))
-            await db.execute(delete(User).where(User.id == user_id))
 
-            print(f"Removed test user: {email}")
+async def cleanup_test_users(db: AsyncSession, test_user_ids: List[uuid.UUID]) -> None:
+    """Remove test users from local database."""
+    print("Cleaning up test users from local database...")
 
-        except Exception as e:
-            # Handle case where tables don't exist (e.g., no migrations run yet)
-            if "no such table" in str(e).lower():
-                print(f"Database tables not found, skipping user cleanup for {email}")
-                continue
-            print(f"Error removing user {email}: {e}")
-            continue
+    if not test_user_ids:
+        print("No test users found, skipping user cleanup")
+        return
 
     try:
-        await db.commit()
+        # Sessions, enrollments, progress and activity logs are removed by
+        # ON DELETE CASCADE on their foreign keys
+        await db.execute(delete(Profile).where(Profile.id.in_(test_user_ids)))
+        result = await db.execute(delete(User).where(User.id.in_(test_user_ids)))
+        print(f"Removed {result.rowcount} test users")
         print("Test users cleaned up from local database")
     except Exception as e:
+        # Handle case where tables don't exist (e.g., no migrations run yet)
         if "no such table" in str(e).lower():
-            print("Database tables not found, skipping user cleanup commit")
+            print("Database tables not found, skipping user cleanup")
         else:
-            print(f"Error committing user cleanup: {e}")
+            print(f"Error during user cleanup: {e}")
             raise
 
 
-async def cleanup_test_courses(db: AsyncSession) -> None:
-    """Remove test courses from Supabase."""
-    print("Cleaning up test courses from Supabase...")
-
+async def get_test_supabase_client() -> Optional[AsyncClient]:
+    """Create the Supabase admin client shared by all Supabase cleanup steps."""
     # Use test Supabase URL if available
     supabase_url = os.getenv("TEST_SUPABASE_URL") or settings.SUPABASE_URL
     supabase_key = os.getenv("TEST_SUPABASE_SERVICE_ROLE_KEY") or settings.SUPABASE_SERVICE_ROLE_KEY
 
     if not supabase_url or not supabase_key:
+        return None
+
+    # No shared httpx client is injected: postgrest, storage and functions each
+    # rebind the base_url and auth headers of the client they are given
+    return await acreate_client(supabase_url, supabase_key)
+
+
+async def cleanup_test_courses(supabase: Optional[AsyncClient]) -> None:
+    """Remove test courses from Supabase."""
+    print("Cleaning up test courses from Supabase...")
+
+    if supabase is None:
         print("Supabase credentials not available, skipping course cleanup")
         return
 
-    from supabase import create_client
-    supabase = create_client(supabase_url, supabase_key)
-
-    for slug in TEST_COURSE_SLUGS:
-        try:
-            # Delete course
-            result = await supabase.table("courses").delete().eq("slug", slug).execute()
-            if result.data:
+    try:
+        # Delete all test courses in a single request
+        result = await supabase.table("courses").delete().in_("id", list(TEST_COURSE_IDS)).execute()
+        removed_slugs = {course["slug"] for course in getattr(result, "data", None) or []}
+        for slug in TEST_COURSE_SLUGS:
+            if slug in removed_slugs:
                 print(f"Removed test course: {slug}")
             else:
                 print(f"Course {slug} not found in Supabase, skipping")
-
-        except Exception as e:
-            print(f"Error removing course {slug}: {e}")
-            continue
+    except Exception as e:
+        print(f"Error removing test courses: {e}")
 
     print("Test courses cleaned up from Supabase")
 
 
-async def cleanup_supabase_users() -> None:
+async def cleanup_supabase_users(supabase: Optional[AsyncClient]) -> None:
     """Remove test users from Supabase Auth and profiles."""
     print("Cleaning up test users from Supabase...")
 
-    # Use test Supabase URL if available
-    supabase_url = os.getenv("TEST_SUPABASE_URL") or settings.SUPABASE_URL
-    supabase_key = os.getenv("TEST_SUPABASE_SERVICE_ROLE_KEY") or settings.SUPABASE_SERVICE_ROLE_KEY
-
-    if not supabase_url or not supabase_key:
+    if supabase is None:
         print("Supabase credentials not available, skipping user cleanup")
         return
 
-    from supabase import create_client
-    supabase = create_client(supabase_url, supabase_key)
-
-    for email in TEST_USER_EMAILS:
-        try:
-            # Get user from profiles
-            profile_response = await supabase.table("profiles").select("id").eq("email", email).execute()
-            profiles = getattr(profile_response, "data", [])
+    try:
+        # Get all test users from profiles in a single request
+        profile_response = await supabase.table("profiles").select("id,email").in_("email", TEST_USER_EMAILS).execute()
+        profiles = getattr(profile_response, "data", None) or []
 
-            if not profiles:
+        found_emails = {profile["email"] for profile in profiles}
+        for email in TEST_USER_EMAILS:
+            if email not in found_emails:
                 print(f"User {email} not found in Supabase profiles, skipping")
-                continue
 
-            user_id = profiles[0]["id"]
+        if not profiles:
+            print("No test users found in Supabase, skipping user cleanup")
+            return
 
-            # Delete from auth using admin method
-            try:
-                await supabase.auth.admin.delete_user(user_id)
-                print(f"Removed user from Supabase Auth: {email}")
-            except Exception as e:
-                print(f"Warning: Failed to delete user from Supabase Auth {email}: {e}")
+        # Delete from auth using admin method; the requests are independent,
+        # so send them concurrently and report failures individually
+        results = await asyncio.gather(
+            *(supabase.auth.admin.delete_user(profile["id"]) for profile in profiles),
+            return_exceptions=True,
+        )
+        for profile, result in zip(profiles, results):
+            if isinstance(result, Exception):
+                print(f"Warning: Failed to delete user from Supabase Auth {profile['email']}: {result}")
+            else:
+                print(f"Removed user from Supabase Auth: {profile['email']}")
 
-            # Delete profile
-            await supabase.table("profiles").delete().eq("id", user_id).execute()
-            print(f"Removed user profile: {email}")
+        # Delete all profiles in a single request
+        user_ids = [profile["id"] for profile in profiles]
+        await supabase.table("profiles").delete().in_("id", user_ids).execute()
+        print(f"Removed {len(user_ids)} user profiles")
 
-        except Exception as e:
-            print(f"Error removing Supabase user {email}: {e}")
-            continue
+    except Exception as e:
+        print(f"Error removing Supabase users: {e}")
 
     print("Test users cleaned up from Supabase")
 
 
-async def cleanup_test_enrollments(db: AsyncSession) -> None:
+async def cleanup_test_enrollments(db: AsyncSession, test_user_ids: List[uuid.UUID]) -> None:
     """Remove test enrollments from local database."""
     print("Cleaning up test enrollments...")
 
     try:
-        # Get all test user IDs
-        test_user_ids = []
-        for email in TEST_USER_EMAILS:
-            user_result = await db.execute(
-                select(User.id).where(User.email == email)
-            )
-            user_id = user_result.scalar()
-            if user_id:
-                test_user_ids.append(user_id)
-
         if not test_user_ids:
             print("No test users found, skipping enrollment cleanup")
             return
 
-        # Delete enrollments for test users in test courses
-        for user_id in test_user_ids:
-            for course_slug in TEST_COURSE_SLUGS:
-                try:
-                    result = await db.execute(
-                        delete(Enrollment).where(
-                            Enrollment.user_id == user_id,
-                            Enrollment.course_slug == course_slug
-                        )
-                    )
-                    if result.rowcount > 0:
-                        print(f"Removed enrollment: user {user_id} from {course_slug}")
-                except Exception as e:
-                    if "no such table" in str(e).lower():
-                        print(f"Enrollment table not found, skipping cleanup for user {user_id} in {course_slug}")
-                        continue
-                    print(f"Error removing enrollment for user {user_id} in {course_slug}: {e}")
-                    continue
-
-        await db.commit()
+        # Delete enrollments for test users in test courses with a single statement
+        result = await db.execute(
+            delete(Enrollment)
+            .where(
+                Enrollment.user_id.in_(test_user_ids),
+                Enrollment.course_slug.in_(TEST_COURSE_SLUGS),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        print(f"Removed {result.rowcount} test enrollments")
         print("Test enrollments cleaned up")
     except Exception as e:
         if "no such table" in str(e).lower():
@@ -225,45 +221,25 @@ async def cleanup_test_enrollments(db: AsyncSession) -> None:
             raise
 
 
-async def cleanup_test_progress(db: AsyncSession) -> None:
+async def cleanup_test_progress(db: AsyncSession, test_user_ids: List[uuid.UUID]) -> None:
     """Remove test progress records from local database."""
     print("Cleaning up test progress...")
 
     try:
-        # Get all test user IDs
-        test_user_ids = []
-        for email in TEST_USER_EMAILS:
-            user_result = await db.execute(
-                select(User.id).where(User.email == email)
-            )
-            user_id = user_result.scalar()
-            if user_id:
-                test_user_ids.append(user_id)
-
         if not test_user_ids:
             print("No test users found, skipping progress cleanup")
             return
 
-        # Delete progress for test users in test courses
-        for user_id in test_user_ids:
-            for course_slug in TEST_COURSE_SLUGS:
-                try:
-                    result = await db.execute(
-                        delete(UserLessonProgress).where(
-                            UserLessonProgress.user_id == user_id,
-                            UserLessonProgress.course_slug == course_slug
-                        )
-                    )
-                    if result.rowcount > 0:
-                        print(f"Removed progress records for user {user_id} in {course_slug}")
-                except Exception as e:
-                    if "no such table" in str(e).lower():
-                        print(f"Progress table not found, skipping cleanup for user {user_id} in {course_slug}")
-                        continue
-                    print(f"Error removing progress for user {user_id} in {course_slug}: {e}")
-                    continue
-
-        await db.commit()
+        # Delete progress for test users in test courses with a single statement
+        result = await db.execute(
+            delete(UserLessonProgress)
+            .where(
+                UserLessonProgress.user_id.in_(test_user_ids),
+                UserLessonProgress.course_slug.in_(TEST_COURSE_SLUGS),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        print(f"Removed {result.rowcount} test progress records")
         print("Test progress cleaned up")
     except Exception as e:
         if "no such table" in str(e).lower():
@@ -273,6 +249,34 @@ async def cleanup_test_progress(db: AsyncSession) -> None:
             raise
 
 
+async def reset_local_database(db: AsyncSession) -> None:
+    """Empty every user-related local table, regardless of which rows are test data."""
+    print("Resetting local database tables...")
+
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(text(f"TRUNCATE TABLE {', '.join(FULL_RESET_TABLES)} RESTART IDENTITY CASCADE"))
+    else:
+        # SQLite has no TRUNCATE; unfiltered deletes use its truncate optimization
+        for table in FULL_RESET_TABLES:
+            await db.execute(text(f"DELETE FROM {table}"))
+
+    print(f"Reset tables: {', '.join(FULL_RESET_TABLES)}")
+
+
+async def cleanup_local_database(full_reset: bool = False) -> None:
+    """Remove test enrollments, progress and users from the local database."""
+    session_factory = get_async_session_factory()
+    # One transaction for all steps; any error rolls the whole cleanup back
+    async with session_factory() as db, db.begin():
+        if full_reset:
+            await reset_local_database(db)
+        else:
+            test_user_ids = await get_test_user_ids(db)
+            await cleanup_test_enrollments(db, test_user_ids)
+            await cleanup_test_progress(db, test_user_ids)
+            await cleanup_test_users(db, test_user_ids)
+
+
 async def main():
     """Main cleanup function."""
     print("🧹 Starting E2E test database cleanup...")
@@ -288,25 +292,34 @@ async def main():
         print("❌ Cleanup is not allowed in production environment")
         sys.exit(1)
 
-    try:
-        # Clean up Supabase data first (courses and users)
-        await cleanup_test_courses(None)  # No DB session needed for Supabase
-        await cleanup_supabase_users()
+    # Fast path for dedicated E2E databases: wipe the local tables instead of
+    # deleting test rows one set at a time. Supabase cleanup stays scoped.
+    full_reset = "--truncate" in sys.argv[1:] or os.getenv("E2E_FULL_RESET", "").lower() in {"1", "true", "yes"}
 
-        # Clean up local database data
-        async for db in get_db():
-            await cleanup_test_users(db)
-            await cleanup_test_enrollments(db)
-            await cleanup_test_progress(db)
-            break  # Only need one session
+    try:
+        # Supabase and the local database are independent, so clean them up
+        # concurrently; a failure in one must not cancel the others mid-flight
+        supabase = await get_test_supabase_client()
+        results = await asyncio.gather(
+            cleanup_test_courses(supabase),
+            cleanup_supabase_users(supabase),
+            cleanup_local_database(full_reset),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise errors[0]
 
         print("\n✅ E2E test database cleanup completed successfully!")
         print("\n📋 Cleanup summary:")
         print("   - Removed test users from local User and Profile tables")
         print("   - Removed test courses from Supabase")
         print("   - Removed test users from Supabase Auth and profiles")
-        print("   - Removed test enrollments and progress records")
-        print("   - Only test data with specific identifiers was removed")
+        if full_reset:
+            print("   - Reset all local user, enrollment and progress tables")
+        else:
+            print("   - Removed test enrollments and progress records")
+            print("   - Only test data with specific identifiers was removed")
 
     except Exception as e:
         print(f"❌ Error during cleanup: {e}")
@@ -316,4 +329,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_async(main())
\ No newline at end of file
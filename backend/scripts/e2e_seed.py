@@ -8,15 +8,19 @@ import os
 import sys
 from pathlib import Path
 from datetime import datetime
+from typing import Dict
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+import aiofiles
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import insert, select
+from supabase import acreate_client
 from src.core.config import settings
+from src.core.utils import run_async
 from src.core.security import get_password_hash
-from src.db.session import get_db, get_supabase_client
+from src.db.session import get_async_session_factory
 from src.models.user import User
 from src.models.profile import Profile
 from src.models.enrollment import Enrollment
@@ -208,87 +212,99 @@ TEST_PROGRESS = [
 ]
 
 
-async def seed_test_courses(db: AsyncSession) -> None:
+async def seed_test_courses() -> None:
     """Seed test courses into the database."""
     print("Seeding test courses...")
 
-    supabase = get_supabase_client()
+    supabase = await acreate_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
-    for course_data in TEST_COURSES:
-        # Check if course already exists
-        try:
-            existing = await supabase.table("courses").select("id").eq("slug", course_data["slug"]).single()
-            if existing.data:
-                print(f"Course {course_data['slug']} already exists, skipping")
-                continue
-        except:
-            pass  # If not found, proceed to create
-
-        # Create course
-        await supabase.table("courses").insert(course_data)
-        print(f"Created course: {course_data['slug']}")
+    # Insert all courses in one request; existing slugs are left untouched
+    result = await (
+        supabase.table("courses")
+        .upsert(TEST_COURSES, on_conflict="slug", ignore_duplicates=True)
+        .execute()
+    )
+    created = getattr(result, "data", None) or []
+    print(f"Created {len(created)} courses, {len(TEST_COURSES) - len(created)} already existed")
 
     print("Test courses seeded successfully")
 
 
-async def seed_test_lessons(db: AsyncSession) -> None:
+async def seed_test_lessons() -> None:
     """Seed test lessons by creating content files."""
     print("Seeding test lessons...")
 
-    for lesson_data in TEST_LESSONS:
-        course_dir = Path(__file__).parent.parent / "content" / "courses" / lesson_data["course_slug"]
-        lesson_file = course_dir / f"{lesson_data['slug']}.lesson"
-
-        if lesson_file.exists():
-            print(f"Lesson {lesson_data['slug']} already exists, skipping")
-            continue
+    courses_dir = Path(__file__).parent.parent / "content" / "courses"
 
+    # List each course directory once instead of probing every lesson file
+    existing_files: Dict[str, set] = {}
+    for course_slug in {lesson_data["course_slug"] for lesson_data in TEST_LESSONS}:
+        course_dir = courses_dir / course_slug
         # Create directory if needed
         course_dir.mkdir(parents=True, exist_ok=True)
+        existing_files[course_slug] = {entry.name for entry in os.scandir(course_dir) if entry.is_file()}
+
+    async def write_lesson(lesson_data: dict) -> None:
+        lesson_filename = f"{lesson_data['slug']}.lesson"
+        if lesson_filename in existing_files[lesson_data["course_slug"]]:
+            print(f"Lesson {lesson_data['slug']} already exists, skipping")
+            return
 
         # Write lesson content
-        with open(lesson_file, 'w', encoding='utf-8') as f:
-            f.write(lesson_data["content"])
+        lesson_file = courses_dir / lesson_data["course_slug"] / lesson_filename
+        async with aiofiles.open(lesson_file, 'w', encoding='utf-8') as f:
+            await f.write(lesson_data["content"])
 
         print(f"Created lesson: {lesson_data['slug']}")
 
+    await asyncio.gather(*(write_lesson(lesson_data) for lesson_data in TEST_LESSONS))
+
     print("Test lessons seeded successfully")
 
 
+async def _get_user_ids_by_email(db: AsyncSession, emails) -> Dict[str, uuid.UUID]:
+    """Resolve user IDs for the given emails with a single query."""
+    result = await db.execute(
+        select(User.id, User.email).where(User.email.in_(set(emails)))
+    )
+    return {email: user_id for user_id, email in result.all()}
+
+
 async def seed_test_enrollments(db: AsyncSession) -> None:
     """Seed test enrollments into the database."""
     print("Seeding test enrollments...")
 
-    for enrollment_data in TEST_ENROLLMENTS:
-        # Get user ID by email
-        user_result = await db.execute(
-            select(User.id).where(User.email == enrollment_data["user_email"])
+    email_to_id = await _get_user_ids_by_email(db, (e["user_email"] for e in TEST_ENROLLMENTS))
+
+    # Load existing enrollments for the test users in one query
+    existing_result = await db.execute(
+        select(Enrollment.user_id, Enrollment.course_slug).where(
+            Enrollment.user_id.in_(list(email_to_id.values()))
         )
-        user_id = user_result.scalar()
+    )
+    existing = set(existing_result.all())
+
+    enrollment_rows = []
+    for enrollment_data in TEST_ENROLLMENTS:
+        user_id = email_to_id.get(enrollment_data["user_email"])
         if not user_id:
             print(f"User {enrollment_data['user_email']} not found, skipping enrollment")
             continue
 
-        # Check if enrollment already exists
-        existing = await db.execute(
-            select(Enrollment.id).where(
-                Enrollment.user_id == user_id,
-                Enrollment.course_slug == enrollment_data["course_slug"]
-            )
-        )
-        if existing.scalar():
+        if (user_id, enrollment_data["course_slug"]) in existing:
             print(f"Enrollment for {enrollment_data['user_email']} in {enrollment_data['course_slug']} already exists, skipping")
             continue
 
-        # Create enrollment
-        enrollment = Enrollment(
-            user_id=user_id,
-            course_slug=enrollment_data["course_slug"]
-        )
-        db.add(enrollment)
+        enrollment_rows.append({
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "course_slug": enrollment_data["course_slug"],
+        })
         print(f"Created enrollment: {enrollment_data['user_email']} -> {enrollment_data['course_slug']}")
 
-    await db.commit()
+    if enrollment_rows:
+        await db.execute(insert(Enrollment), enrollment_rows)
+
     print("Test enrollments seeded successfully")
 
 
@@ -296,83 +312,123 @@ async def seed_test_progress(db: AsyncSession) -> None:
     """Seed test progress records into the database."""
     print("Seeding test progress...")
 
+    email_to_id = await _get_user_ids_by_email(db, (p["user_email"] for p in TEST_PROGRESS))
+
+    # Load existing progress records for the test users in one query
+    existing_result = await db.execute(
+        select(
+            UserLessonProgress.user_id,
+            UserLessonProgress.course_slug,
+            UserLessonProgress.lesson_slug,
+        ).where(UserLessonProgress.user_id.in_(list(email_to_id.values())))
+    )
+    existing = set(existing_result.all())
+
+    completion_date = datetime.utcnow()
+    progress_rows = []
     for progress_data in TEST_PROGRESS:
-        # Get user ID by email
-        user_result = await db.execute(
-            select(User.id).where(User.email == progress_data["user_email"])
-        )
-        user_id = user_result.scalar()
+        user_id = email_to_id.get(progress_data["user_email"])
         if not user_id:
             print(f"User {progress_data['user_email']} not found, skipping progress")
             continue
 
-        # Check if progress already exists
-        existing = await db.execute(
-            select(UserLessonProgress.id).where(
-                UserLessonProgress.user_id == user_id,
-                UserLessonProgress.course_slug == progress_data["course_slug"],
-                UserLessonProgress.lesson_slug == progress_data["lesson_slug"]
-            )
-        )
-        if existing.scalar():
+        if (user_id, progress_data["course_slug"], progress_data["lesson_slug"]) in existing:
             print(f"Progress for {progress_data['user_email']} on {progress_data['lesson_slug']} already exists, skipping")
             continue
 
-        # Create progress
-        from datetime import datetime
-        progress = UserLessonProgress(
-            user_id=user_id,
-            course_slug=progress_data["course_slug"],
-            lesson_slug=progress_data["lesson_slug"],
-            completion_date=datetime.utcnow()
-        )
-        db.add(progress)
+        progress_rows.append({
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "course_slug": progress_data["course_slug"],
+            "lesson_slug": progress_data["lesson_slug"],
+            "completion_date": completion_date,
+        })
         print(f"Created progress: {progress_data['user_email']} completed {progress_data['lesson_slug']}")
 
-    await db.commit()
+    if progress_rows:
+        await db.execute(insert(UserLessonProgress), progress_rows)
+
     print("Test progress seeded successfully")
 
 
+async def seed_test_database() -> None:
+    """Seed users, enrollments and progress in one local database transaction."""
+    async with get_async_session_factory()() as db, db.begin():
+        # Users must exist before enrollments and progress can reference them
+        await seed_test_users(db)
+        await seed_test_enrollments(db)
+        await seed_test_progress(db)
+
+
+def _insert_ignoring_conflicts(db: AsyncSession, model):
+    """Build an INSERT ... ON CONFLICT DO NOTHING for the session's dialect."""
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(model)
+
+
 async def seed_test_users(db: AsyncSession) -> None:
     """Seed test users into the database."""
     print("Seeding test users...")
 
+    # One cheap probe first so reruns skip bcrypt for users that already exist
+    existing_ids = await _get_user_ids_by_email(db, [user_data["email"] for user_data in TEST_USERS])
+    new_users = [user_data for user_data in TEST_USERS if user_data["email"] not in existing_ids]
     for user_data in TEST_USERS:
-        # Check if user already exists
-        existing_user = await db.execute(
-            select(User.id).where(User.email == user_data["email"])
-        )
-        if existing_user.scalar():
+        if user_data["email"] in existing_ids:
+            print(f"User {user_data['email']} already exists, skipping")
+    if not new_users:
+        print("Test users seeded successfully")
+        return
+
+    # bcrypt is slow and releases the GIL, so hash off the event loop in parallel
+    hashed_passwords = await asyncio.gather(
+        *(asyncio.to_thread(get_password_hash, user_data["password"]) for user_data in new_users)
+    )
+
+    user_rows = []
+    for user_data, hashed_password in zip(new_users, hashed_passwords):
+        user_rows.append({
+            "id": uuid.uuid4(),
+            "email": user_data["email"],
+            "hashed_password": hashed_password,
+            "full_name": user_data["full_name"],
+            "role": user_data["role"],
+            "status": "ACTIVE" if user_data["email"] != "testinactive@example.com" else "BLOCKED",
+        })
+
+    # Insert all new users in one statement; emails created concurrently since
+    # the probe are skipped by the database and only inserted rows come back
+    created_result = await db.execute(
+        _insert_ignoring_conflicts(db, User)
+        .values(user_rows)
+        .on_conflict_do_nothing(index_elements=["email"])
+        .returning(User.id, User.email)
+    )
+    created_ids = {email: user_id for user_id, email in created_result.all()}
+
+    profile_rows = []
+    for user_data in new_users:
+        if user_data["email"] not in created_ids:
             print(f"User {user_data['email']} already exists, skipping")
             continue
+        profile_rows.append({
+            "id": created_ids[user_data["email"]],
+            "email": user_data["email"],
+            "full_name": user_data["full_name"],
+            "role": user_data["role"].lower(),
+        })
+        print(f"Created user: {user_data['email']}")
 
-        # Create user
-        user_id = uuid.uuid4()
-        hashed_password = get_password_hash(user_data["password"])
-
-        user = User(
-            id=user_id,
-            email=user_data["email"],
-            hashed_password=hashed_password,
-            full_name=user_data["full_name"],
-            role=user_data["role"],
-            status="ACTIVE" if user_data["email"] != "testinactive@example.com" else "BLOCKED"
-        )
-
-        db.add(user)
-
-        # Create profile
-        profile = Profile(
-            id=user_id,
-            email=user_data["email"],
-            full_name=user_data["full_name"],
-            role=user_data["role"].lower()
+    if profile_rows:
+        await db.execute(
+            _insert_ignoring_conflicts(db, Profile)
+            .values(profile_rows)
+            .on_conflict_do_nothing(index_elements=["email"])
         )
 
-        db.add(profile)
-        print(f"Created user: {user_data['email']}")
-
-    await db.commit()
     print("Test users seeded successfully")
 
 
@@ -386,13 +442,17 @@ async def main():
     #     sys.exit(1)
 
     try:
-        async for db in get_db():
-            await seed_test_users(db)
-            await seed_test_courses(db)
-            await seed_test_lessons(db)
-            await seed_test_enrollments(db)
-            await seed_test_progress(db)
-            break  # Only need one session
+        # Courses (Supabase) and lessons (filesystem) are independent of the local
+        # database, so a failure in one must not roll back or cancel the others
+        results = await asyncio.gather(
+            seed_test_database(),
+            seed_test_courses(),
+            seed_test_lessons(),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise errors[0]
 
         print("\n🎉 E2E test database seeding completed successfully!")
         print("\n🔑 Test accounts created:")
@@ -413,4 +473,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run_async(main())
\ No newline at end of file
@@ -11,7 +11,7 @@ import asyncio
 import os
 import sys
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Set
 from uuid import uuid4
 import requests
 
@@ -23,12 +23,16 @@ load_dotenv(dotenv_path=Path(__file__).parent.parent.parent / ".env")
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from supabase import Client, create_client
+from supabase import AuthApiError, Client, create_client
 from src.core.logging import get_logger
 from src.core.config import settings
+from src.core.utils import run_async
 
 logger = get_logger(__name__)
 
+# Maximum number of test users created in Supabase Auth at once
+SEED_CONCURRENCY = 8
+
 # Test user data - predictable credentials for integration tests
 TEST_USERS = [
     {
@@ -78,21 +82,31 @@ class IntegrationSeeder:
         # Create admin client for seeding
         self.supabase: Client = create_client(self.supabase_url, self.supabase_service_key)
 
+    # Blocking PostgREST calls, run on the default executor with their arguments bound
+    def _select_profiles_by_email(self, emails: List[str]) -> Any:
+        return self.supabase.table("profiles").select("id, email").in_("email", emails).execute()
+
+    def _upsert_profiles(self, users: List[Dict[str, Any]]) -> Any:
+        return self.supabase.table("profiles").upsert(users, on_conflict="email", ignore_duplicates=True).execute()
+
+    def _delete_profiles_by_id(self, user_ids: List[str]) -> Any:
+        return self.supabase.table("profiles").delete().in_("id", user_ids).execute()
+
     async def _create_user_in_auth(self, user_data: Dict[str, str]) -> str:
         """Create user in Supabase Auth using admin client for auto-confirmation."""
         try:
             # Use admin client method for creating confirmed users (required for testing)
+            attributes = {
+                "email": user_data["email"],
+                "password": user_data["password"],
+                "email_confirm": True,  # Skip email confirmation for tests
+                "user_metadata": {
+                    "full_name": user_data["full_name"],
+                    "role": user_data["role"]
+                }
+            }
             response = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self.supabase.auth.admin.create_user({
-                    "email": user_data["email"],
-                    "password": user_data["password"],
-                    "email_confirm": True,  # Skip email confirmation for tests
-                    "user_metadata": {
-                        "full_name": user_data["full_name"],
-                        "role": user_data["role"]
-                    }
-                })
+                None, self.supabase.auth.admin.create_user, attributes
             )
 
             if not response.user:
@@ -106,114 +120,125 @@ class IntegrationSeeder:
             logger.error(f"Failed to create auth user {user_data['email']}: {str(e)}")
             raise
 
-    async def _create_user_profile(self, user_id: str, user_data: Dict[str, str]) -> None:
-        """Create user profile in the profiles table."""
+    async def _create_user_profiles(self, users: List[Dict[str, Any]]) -> None:
+        """Create profiles for the given users in a single upsert, skipping existing emails."""
         try:
-            profile_data = {
-                "id": user_id,
-                "email": user_data["email"],
-                "full_name": user_data["full_name"],
-                "role": user_data["role"]
-            }
-
             response = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self.supabase.table("profiles").insert(profile_data).execute()
+                None, self._upsert_profiles, users
             )
 
-            if not getattr(response, "data", None):
-                raise ValueError(f"Failed to create profile for user {user_data['email']}")
-
-            logger.info(f"Created profile for user: {user_data['email']}")
+            logger.info(f"Created {len(getattr(response, 'data', None) or [])} profiles for {len(users)} test users")
 
         except Exception as e:
-            logger.error(f"Failed to create profile for user {user_data['email']}: {str(e)}")
+            logger.error(f"Failed to create profiles for test users: {str(e)}")
             raise
 
-    async def _user_exists(self, email: str) -> bool:
-        """Check if user already exists in profiles."""
+    async def _delete_auth_users(self, user_ids: List[str]) -> List[Any]:
+        """Delete the given users from Supabase Auth, returning each result or exception in order."""
+        loop = asyncio.get_event_loop()
+        return await asyncio.gather(*(
+            loop.run_in_executor(None, self.supabase.auth.admin.delete_user, user_id)
+            for user_id in user_ids
+        ), return_exceptions=True)
+
+    async def _get_existing_emails(self, emails: List[str]) -> Set[str]:
+        """Return which of the given emails already have a profile, in one query."""
         try:
             response = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self.supabase.table("profiles").select("id").eq("email", email).execute()
+                None, self._select_profiles_by_email, emails
             )
-            return bool(getattr(response, "data", []))
+            return {profile["email"] for profile in getattr(response, "data", None) or []}
         except Exception as e:
-            logger.warning(f"Error checking if user exists {email}: {str(e)}")
-            return False
+            logger.warning(f"Error checking which test users already exist: {str(e)}")
+            return set()
 
-    async def seed_test_users(self) -> List[Dict[str, Any]]:
-        """Seed all test users."""
-        created_users = []
-
-        for user_data in TEST_USERS:
-            try:
-                # Check if user already exists
-                if await self._user_exists(user_data["email"]):
-                    logger.info(f"User {user_data['email']} already exists, skipping")
-                    continue
-
-                # Create user in auth
+    async def _seed_one(self, user_data: Dict[str, str], auth_slots: asyncio.Semaphore) -> Optional[Dict[str, Any]]:
+        """Create a single test user in auth and return its profile row."""
+        try:
+            # Bound concurrent admin calls so the auth API isn't flooded
+            async with auth_slots:
                 user_id = await self._create_user_in_auth(user_data)
 
-                # Create profile
-                await self._create_user_profile(user_id, user_data)
+            return {
+                "id": user_id,
+                "email": user_data["email"],
+                "full_name": user_data["full_name"],
+                "role": user_data["role"]
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to create user {user_data['email']}: {str(e)}")
+            # Continue with other users
+            return None
 
-                created_users.append({
-                    "id": user_id,
-                    "email": user_data["email"],
-                    "full_name": user_data["full_name"],
-                    "role": user_data["role"]
-                })
+    async def seed_test_users(self) -> List[Dict[str, Any]]:
+        """Seed all test users."""
+        existing_emails = await self._get_existing_emails([user["email"] for user in TEST_USERS])
+        for email in existing_emails:
+            logger.info(f"User {email} already exists, skipping")
+
+        auth_slots = asyncio.Semaphore(SEED_CONCURRENCY)
+        results = await asyncio.gather(*(
+            self._seed_one(user_data, auth_slots)
+            for user_data in TEST_USERS
+            if user_data["email"] not in existing_emails
+        ))
+        created_users = [user for user in results if user]
+        if not created_users:
+            return []
 
-            except Exception as e:
-                logger.error(f"Failed to create user {user_data['email']}: {str(e)}")
-                # Continue with other users
-                continue
+        try:
+            await self._create_user_profiles(created_users)
+        except Exception:
+            # Roll back the auth users so a rerun can create them again with their profiles
+            results = await self._delete_auth_users([user["id"] for user in created_users])
+            orphaned = [user for user, result in zip(created_users, results) if isinstance(result, Exception)]
+            if orphaned:
+                logger.error(
+                    "Auth users left without a profile: "
+                    + ", ".join(f"{user['email']} (ID: {user['id']})" for user in orphaned)
+                )
+            raise
 
         return created_users
 
     async def cleanup_test_users(self) -> int:
         """Remove all test users (for cleanup between test runs)."""
-        deleted_count = 0
-
-        for user_data in TEST_USERS:
-            try:
-                # Get user from profiles
-                profile_response = await asyncio.get_event_loop().run_in_executor(
-                    None,
-                    lambda: self.supabase.table("profiles").select("id").eq("email", user_data["email"]).execute()
-                )
-
-                profiles = getattr(profile_response, "data", [])
-                if not profiles:
-                    continue
-
-                user_id = profiles[0]["id"]
-
-                # Try to delete from auth using admin method
-                try:
-                    await asyncio.get_event_loop().run_in_executor(
-                        None,
-                        lambda: self.supabase.auth.admin.delete_user(user_id)
-                    )
-                except Exception as e:
-                    logger.warning(f"Failed to delete user from auth {user_data['email']}: {str(e)}")
-
-                # Also try to delete profile explicitly
-                await asyncio.get_event_loop().run_in_executor(
-                    None,
-                    lambda: self.supabase.table("profiles").delete().eq("id", user_id).execute()
-                )
-
-                deleted_count += 1
-                logger.info(f"Deleted test user: {user_data['email']}")
+        loop = asyncio.get_event_loop()
+        try:
+            # One select for every test profile gives us the auth ids
+            profile_response = await loop.run_in_executor(
+                None, self._select_profiles_by_email, [user["email"] for user in TEST_USERS]
+            )
+        except Exception as e:
+            logger.warning(f"Failed to look up test user profiles: {str(e)}")
+            return 0
+
+        profiles = getattr(profile_response, "data", None) or []
+        results = await self._delete_auth_users([profile["id"] for profile in profiles])
+
+        # Keep the profile of any user still in auth so a rerun can find and retry it;
+        # a user already missing from auth counts as deleted, or its profile would stick forever
+        deleted_ids = []
+        for profile, result in zip(profiles, results):
+            if isinstance(result, AuthApiError) and (result.code == "user_not_found" or result.status == 404):
+                deleted_ids.append(profile["id"])
+                logger.info(f"Test user already removed from auth: {profile['email']}")
+            elif isinstance(result, Exception):
+                logger.warning(f"Failed to delete user from auth {profile['email']}: {str(result)}")
+            else:
+                deleted_ids.append(profile["id"])
+                logger.info(f"Deleted test user: {profile['email']}")
+
+        if not deleted_ids:
+            return 0
 
-            except Exception as e:
-                logger.warning(f"Failed to delete user {user_data['email']}: {str(e)}")
-                continue
+        try:
+            await loop.run_in_executor(None, self._delete_profiles_by_id, deleted_ids)
+        except Exception as e:
+            logger.warning(f"Failed to delete test user profiles: {str(e)}")
 
-        return deleted_count
+        return len(deleted_ids)
 
 
 async def main():
@@ -281,6 +306,6 @@ async def cleanup_main():
 
 if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "--cleanup":
-        asyncio.run(cleanup_main())
+        run_async(cleanup_main())
     else:
-        asyncio.run(main())
\ No newline at end of file
+        run_async(main())
\ No newline at end of file
@@ -1,7 +1,7 @@
 from typing import List
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 
 from src.core.security import get_current_user
 from src.db.session import get_supabase_client
@@ -22,18 +22,16 @@ async def _finalize(result):
     return result
 
 
-@router.get("/my-courses", response_model=List[CourseWithProgress])
-async def get_my_courses(current_user: User = Depends(get_current_user)) -> List[CourseWithProgress]:
-    supabase = get_supabase_client()
-    try:
-        # For now, return empty list since courses table doesn't exist yet
-        # TODO: Implement proper courses functionality when database schema is ready
-        logger.info(f"User {current_user.user_id} requested courses - returning empty list (courses table not yet implemented)")
-        return []
-    except Exception as exc:
-        logger.error(f"Dashboard courses request failed: {str(exc)}")
-        logger.error(f"Exception type: {type(exc)}")
-        raise
+# Pre-encoded body for the placeholder response, skipping model validation and JSON encoding
+EMPTY_COURSES_BODY = b"[]"
+
+
+@router.get("/my-courses", responses={200: {"model": List[CourseWithProgress]}})
+async def get_my_courses(current_user: User = Depends(get_current_user)) -> Response:
+    # For now, return empty list since courses table doesn't exist yet
+    # TODO: Implement proper courses functionality when database schema is ready
+    logger.info(f"User {current_user.user_id} requested courses - returning empty list (courses table not yet implemented)")
+    return Response(content=EMPTY_COURSES_BODY, media_type="application/json")
 
 
 @router.get("/courses/{slug}", response_model=CourseDetailsWithProgress)
@@ -29,11 +29,21 @@ class Settings(BaseSettings):
         if len(v) < 32:
             raise ValueError('SECRET_KEY must be at least 32 characters long')
         # Check for complexity: at least one uppercase, one lowercase, one digit, one special char
-        has_upper = any(c.isupper() for c in v)
-        has_lower = any(c.islower() for c in v)
-        has_digit = any(c.isdigit() for c in v)
-        has_special = any(not c.isalnum() for c in v)
-        if not (has_upper and has_lower and has_digit and has_special):
+        # Single pass: one bit per character class, stopping once all four are seen
+        classes = 0
+        for c in v:
+            if c.isupper():
+                classes |= 1
+            elif c.islower():
+                classes |= 2
+            elif c.isdigit():
+                classes |= 4
+            # Not an elif: a character can be both cased and non-alphanumeric (e.g. circled letters)
+            if not c.isalnum():
+                classes |= 8
+            if classes == 15:
+                break
+        if classes != 15:
             raise ValueError('SECRET_KEY must contain at least one uppercase letter, one lowercase letter, one digit, and one special character')
         return v
 
@@ -1,21 +1,49 @@
 from uuid import UUID
+from hashlib import blake2b
 import logging
 import asyncio
+import time
 from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
 
+from cachetools import LRUCache, TTLCache
 import jwt
 from jwt import ExpiredSignatureError, PyJWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
 
 from src.core.config import settings
 from src.core.errors import AuthenticationError, AuthorizationError, ValidationError
-from src.db.session import get_supabase_client, get_supabase_admin_client
+from src.db.session import get_async_session_factory
+from src.models.profile import Profile
 from src.schemas.user import User
+from src.services.user_service import UserService
 
 logger = logging.getLogger(__name__)
 
 
+# Tokens are reused for many requests until they expire, so keep verified payloads
+# (keyed by a digest, never the raw token) to skip repeated signature checks.
+_decoded_tokens: LRUCache = LRUCache(maxsize=4096)
+
+
+def reload_settings() -> None:
+    """Re-read the settings used on every request; call after changing settings at runtime."""
+    global _SECRET_KEY, _ALGORITHM, _ALGORITHMS, _TESTING, _DATABASE_CONFIGURED
+    _SECRET_KEY = settings.SECRET_KEY
+    _ALGORITHM = settings.ALGORITHM
+    _ALGORITHMS = [settings.ALGORITHM]
+    _TESTING = settings.TESTING
+    _DATABASE_CONFIGURED = bool(settings.DATABASE_URL)
+    # Payloads verified under the old key or algorithm must not outlive it
+    _decoded_tokens.clear()
+
+
+# Bound once at import so the request path does plain name lookups instead of settings attribute access
+reload_settings()
+
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
@@ -23,7 +51,7 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=15)
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _SECRET_KEY, algorithm=_ALGORITHM)
     return encoded_jwt
 
 
@@ -34,72 +62,122 @@ def create_refresh_token(data: dict, expires_delta: timedelta = None):
     else:
         expire = datetime.now(timezone.utc) + timedelta(days=7)  # Default 7 days
     to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _SECRET_KEY, algorithm=_ALGORITHM)
     return encoded_jwt
 
 
+# Shared by every 401 raised below; Starlette only reads exception headers, never mutates them
+UNAUTHORIZED_HEADERS = {"WWW-Authenticate": "Bearer"}
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    # A fresh exception per raise: reusing one instance would chain tracebacks across requests
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail, headers=UNAUTHORIZED_HEADERS)
+
+
+def _parse_subject(payload: dict) -> Optional[UUID]:
+    try:
+        return UUID(payload["sub"])
+    except (KeyError, TypeError, AttributeError, ValueError):
+        return None
+
+
+def _decode_token(token: str) -> Tuple[dict, Optional[UUID]]:
+    """Verify a token and return its payload with the parsed ``sub`` (None if absent or not a UUID)."""
+    key = blake2b(token.encode(), digest_size=16).digest()
+    cached = _decoded_tokens.get(key)
+    if cached is not None:
+        payload, expires_at, user_uuid = cached
+        if expires_at <= time.time():
+            _decoded_tokens.pop(key, None)
+            raise ExpiredSignatureError("Signature has expired")
+        return dict(payload), user_uuid
+
+    payload = jwt.decode(token, _SECRET_KEY, algorithms=_ALGORITHMS)
+    user_uuid = _parse_subject(payload)
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        _decoded_tokens[key] = (dict(payload), float(exp), user_uuid)
+    return payload, user_uuid
+
+
 def verify_refresh_token(token: str):
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload, _ = _decode_token(token)
         token_type = payload.get("type")
         if token_type != "refresh":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token type",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            raise _unauthorized("Invalid token type")
         return payload
     except ExpiredSignatureError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Refresh token expired",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _unauthorized("Refresh token expired")
     except PyJWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid refresh token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _unauthorized("Invalid refresh token")
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Profiles change rarely, so keep them briefly in-process to spare authenticated
+# requests the database query. Concurrent misses for the same user share one fetch.
+PROFILE_CACHE_TTL_SECONDS = 60
+_profile_cache: TTLCache = TTLCache(maxsize=10_000, ttl=PROFILE_CACHE_TTL_SECONDS)
+_profile_fetches: Dict[UUID, "asyncio.Future[Optional[dict]]"] = {}
+
+
+async def _fetch_profile(user_uuid: UUID) -> Optional[dict]:
+    # Read through the pooled async engine rather than a PostgREST call on an executor thread
+    async with get_async_session_factory()() as db:
+        result = await db.execute(
+            select(Profile.full_name, Profile.email, Profile.role).where(Profile.id == user_uuid)
+        )
+        profile = result.mappings().first()
+    return dict(profile) if profile else None
+
+
+async def _get_profile(user_uuid: UUID) -> Optional[dict]:
+    profile = _profile_cache.get(user_uuid)
+    if profile is not None:
+        return profile
+
+    fetch = _profile_fetches.get(user_uuid)
+    if fetch is None:
+        fetch = asyncio.ensure_future(_fetch_profile(user_uuid))
+        _profile_fetches[user_uuid] = fetch
+
+        def _store(done: "asyncio.Future[Optional[dict]]") -> None:
+            _profile_fetches.pop(user_uuid, None)
+            if not done.cancelled() and done.exception() is None and done.result():
+                _profile_cache[user_uuid] = done.result()
+
+        fetch.add_done_callback(_store)
+
+    # Shield the shared fetch so one cancelled request doesn't cancel it for the others
+    return await asyncio.shield(fetch)
+
+
+def invalidate_profile_cache(user_id: Optional[UUID] = None) -> None:
+    """Drop the cached profile for a user (e.g. after a role change), or all profiles."""
+    if user_id is None:
+        _profile_cache.clear()
+    else:
+        _profile_cache.pop(user_id, None)
+
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload, user_uuid = _decode_token(token)
         token_type = payload.get("type")
         if token_type != "access":
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token type",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            raise _unauthorized("Invalid token type")
         user_id = payload.get("sub")
         email = payload.get("email")
         if not user_id or not email:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token payload",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            raise _unauthorized("Invalid token payload")
     except ExpiredSignatureError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token expired",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _unauthorized("Token expired")
     except PyJWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _unauthorized("Invalid authentication credentials")
 
-    try:
-        user_uuid = UUID(user_id)
-    except ValueError:
+    if user_uuid is None:
         raise ValidationError(f"Invalid user ID format: {user_id}")
 
     def build_fallback_user() -> User:
@@ -111,25 +189,16 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
             role="student",
         )
 
-    if settings.TESTING or not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
+    if _TESTING or not _DATABASE_CONFIGURED:
         return build_fallback_user()
 
     try:
-        supabase = get_supabase_client()
-        response = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: supabase.table('profiles')
-            .select('full_name, email, role')
-            .eq('id', str(user_uuid))
-            .execute()
-        )
-        profile_data = getattr(response, "data", None)
-        if not profile_data:
-            logger.warning("User profile not found in Supabase, using fallback")
+        profile = await _get_profile(user_uuid)
+        if not profile:
+            logger.warning("User profile not found in the database, using fallback")
             return build_fallback_user()
-        profile = profile_data[0]
     except Exception:
-        logger.warning("Failed to fetch user profile from Supabase, using fallback", exc_info=True)
+        logger.warning("Failed to fetch user profile from the database, using fallback", exc_info=True)
         return build_fallback_user()
 
     return User(
@@ -140,12 +209,6 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     )
 
 
-async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
-    if current_user.role != "admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin access required",
-        )
 async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
     if current_user.role != "admin":
         raise HTTPException(
@@ -157,6 +220,4 @@ async def get_current_admin(current_user: User = Depends(get_current_user)) -> U
 
 def get_password_hash(password: str) -> str:
     """Hash a password using the UserService method."""
-    from src.services.user_service import UserService
     return UserService.hash_password(password)
-    return current_user
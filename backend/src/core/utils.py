@@ -1,11 +1,17 @@
+import asyncio
 import inspect
-from typing import Any
+from typing import Any, Coroutine
 
 try:  # pragma: no cover - optional dependency for test environments
     from unittest.mock import AsyncMock
 except ImportError:  # pragma: no cover
     AsyncMock = None
 
+try:  # uvloop ships with uvicorn[standard]; fall back to the stock loop where it's unavailable
+    import uvloop
+except ImportError:  # pragma: no cover
+    uvloop = None
+
 from src.core.logging import get_logger
 from src.core.errors import ExternalServiceError
 
@@ -43,3 +49,9 @@ async def maybe_await(value: Any) -> Any:
     if inspect.isawaitable(value):
         return await value
     return value
+
+
+def run_async(main: Coroutine) -> Any:
+    """Run a script's entry-point coroutine on uvloop when installed, otherwise on asyncio's default loop."""
+    loop_factory = uvloop.new_event_loop if uvloop is not None else None
+    return asyncio.run(main, loop_factory=loop_factory)
@@ -3,11 +3,15 @@ from typing import AsyncGenerator, Optional, Callable, TypeVar, Awaitable
 from contextlib import asynccontextmanager
 from functools import wraps
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, AsyncEngine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 from sqlalchemy.exc import SQLAlchemyError
 
+import httpx
 from supabase import create_client, Client
+from supabase.lib.client_options import SyncClientOptions
 from src.core.config import settings
 from src.core.logging import get_logger
 
@@ -35,13 +39,29 @@ def get_database_engine() -> AsyncEngine:
 
         # Adjust connection pooling for SQLite in tests
         if settings.TESTING and "sqlite" in database_url:
+            if ":memory:" in database_url:
+                # Every connection to :memory: is a separate database, so share a single one
+                pool_options = {"poolclass": StaticPool}
+            else:
+                # Keep connections (and their page caches) open across sessions
+                pool_options = {"poolclass": AsyncAdaptedQueuePool, "pool_size": 5, "max_overflow": 10}
+
             _engine = create_async_engine(
                 database_url,
                 echo=False,  # Set to True for SQL query logging
                 future=True,
-                # SQLite doesn't support connection pooling in the same way
+                # Local SQLite files don't drop idle connections, so skip the ping
                 pool_pre_ping=False,
+                connect_args={"check_same_thread": False},
+                **pool_options,
             )
+
+            # SQLite only enforces foreign keys (and ON DELETE CASCADE) when enabled per connection
+            @event.listens_for(_engine.sync_engine, "connect")
+            def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                cursor.execute("PRAGMA foreign_keys=ON")
+                cursor.close()
         else:
             connect_args = {}
             if database_url.startswith("postgresql+asyncpg"):
@@ -57,7 +77,7 @@ def get_database_engine() -> AsyncEngine:
                 pool_size=10,  # Number of connections to maintain
                 max_overflow=20,  # Maximum number of connections beyond pool_size
                 pool_timeout=30,  # Timeout for getting a connection from pool
-                pool_recycle=3600,  # Recycle connections after 1 hour
+                pool_recycle=1800,  # Recycle connections after 30 minutes
                 pool_pre_ping=True,  # Verify connections before use
                 connect_args=connect_args,
             )
@@ -107,23 +127,55 @@ from supabase import create_client, Client
 from src.core.config import settings
 
 
+# Supabase clients are shared across requests so TLS sessions and keep-alive
+# connections to PostgREST are reused instead of re-established per call.
+# No httpx client is injected: postgrest, storage and functions each rebind the
+# base_url and auth headers of the client they are given, so every Client (one per
+# key) lets each of its sub-clients open a private HTTP/2 keep-alive pool instead.
+# Fail fast on unreachable hosts; REST calls on the request path should answer well within 5s
+SUPABASE_HTTP_TIMEOUT = httpx.Timeout(5, connect=2)
+
+_supabase_client: Optional[Client] = None
+_supabase_admin_client: Optional[Client] = None
+
+
+def _create_supabase_client(url: str, key: str) -> Client:
+    return create_client(url, key, options=SyncClientOptions(postgrest_client_timeout=SUPABASE_HTTP_TIMEOUT))
+
+
 def get_supabase_client() -> Client:
     """
-    Create the client inside the function to ensure compatibility with the serverless
-    environment. This guarantees that for each "cold" function call, a new, fresh client is created.
+    Return the shared anon-key Supabase client, creating it on first use.
+    The client is built once per process (or at startup via the app lifespan),
+    so warm invocations reuse its pooled connections.
     """
-    url = settings.SUPABASE_URL
-    key = settings.SUPABASE_KEY
-    return create_client(url, key)
+    global _supabase_client
+    if _supabase_client is None:
+        _supabase_client = _create_supabase_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+    return _supabase_client
 
 
 def get_supabase_admin_client() -> Client:
     """
-    Create a client with service role key for administrative operations,
+    Return the shared client with service role key for administrative operations,
     such as checking email existence without RLS restrictions.
     """
-    url = settings.SUPABASE_URL
+    global _supabase_admin_client
     key = settings.SUPABASE_SERVICE_ROLE_KEY
     if not key:
         raise ValueError("SUPABASE_SERVICE_ROLE_KEY is required for admin operations")
-    return create_client(url, key)
+    if _supabase_admin_client is None:
+        _supabase_admin_client = _create_supabase_client(settings.SUPABASE_URL, key)
+    return _supabase_admin_client
+
+
+def close_supabase_clients() -> None:
+    """
+    Drop the shared Supabase clients and close their PostgREST connection pools.
+    """
+    global _supabase_client, _supabase_admin_client
+    for client in (_supabase_client, _supabase_admin_client):
+        if client is not None:
+            client.postgrest.session.close()
+    _supabase_client = None
+    _supabase_admin_client = None
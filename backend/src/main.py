@@ -1,6 +1,7 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+import orjson
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi.errors import RateLimitExceeded
@@ -8,6 +9,7 @@ from slowapi.errors import RateLimitExceeded
 from src.core.config import settings
 from src.core.logging import app_logger, RequestIDMiddleware
 from src.core.rate_limiting import limiter
+from src.db.session import close_supabase_clients, get_supabase_client
 from src.core.errors import (
     ContentFileNotFoundError,
     SecurityError,
@@ -42,17 +44,25 @@ async def lifespan(app: FastAPI):
         app_logger.info("Environment validation successful")
         if settings.DATABASE_URL:
             app_logger.info(f"Database URL configured: {settings.DATABASE_URL[:20]}...")
+        if settings.SUPABASE_URL and settings.SUPABASE_KEY:
+            # Build the shared client up front so the first request doesn't pay for it
+            get_supabase_client()
         app_logger.info("Application startup complete")
-        yield
     except Exception as exc:
         app_logger.error(f"Startup validation failed: {exc}")
         raise
 
+    try:
+        yield
+    finally:
+        close_supabase_clients()
+
 app = FastAPI(
     title="The Lab Academy API",
     description="Backend API for The Lab Academy learning platform",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Add middleware
@@ -67,42 +77,31 @@ app.add_middleware(
 app.add_middleware(SlowAPIMiddleware)
 app.state.limiter = limiter
 
-# Exception handlers
-@app.exception_handler(ContentFileNotFoundError)
-async def handle_content_file_not_found(request, exc):
-    return JSONResponse(status_code=404, content={"detail": "Content file not found"})
-
-@app.exception_handler(SecurityError)
-async def handle_security_error(request, exc):
-    return JSONResponse(status_code=403, content={"detail": "Security violation"})
-
-@app.exception_handler(ParsingError)
-async def handle_parsing_error(request, exc):
-    return JSONResponse(status_code=400, content={"detail": "Parsing failed"})
-
-@app.exception_handler(AuthenticationError)
-async def handle_authentication_error(request, exc):
-    return JSONResponse(status_code=401, content={"detail": "Authentication failed"})
+# Exception handlers: each domain error maps to a fixed status code and message
+EXCEPTION_RESPONSES = {
+    ContentFileNotFoundError: (404, "Content file not found"),
+    SecurityError: (403, "Security violation"),
+    ParsingError: (400, "Parsing failed"),
+    AuthenticationError: (401, "Authentication failed"),
+    AuthorizationError: (403, "Authorization failed"),
+    ValidationError: (422, "Validation failed"),
+    DatabaseError: (500, "Database error"),
+    ExternalServiceError: (502, "External service error"),
+    RateLimitExceeded: (429, "Rate limit exceeded"),
+}
 
-@app.exception_handler(AuthorizationError)
-async def handle_authorization_error(request, exc):
-    return JSONResponse(status_code=403, content={"detail": "Authorization failed"})
 
-@app.exception_handler(ValidationError)
-async def handle_validation_error(request, exc):
-    return JSONResponse(status_code=422, content={"detail": "Validation failed"})
+def _make_exception_handler(status_code: int, detail: str):
+    # The body never varies, so encode it once instead of on every error
+    body = orjson.dumps({"detail": detail})
 
-@app.exception_handler(DatabaseError)
-async def handle_database_error(request, exc):
-    return JSONResponse(status_code=500, content={"detail": "Database error"})
+    async def handle_exception(request, exc):
+        return Response(content=body, status_code=status_code, media_type=ORJSONResponse.media_type)
+    return handle_exception
 
-@app.exception_handler(ExternalServiceError)
-async def handle_external_service_error(request, exc):
-    return JSONResponse(status_code=502, content={"detail": "External service error"})
 
-@app.exception_handler(RateLimitExceeded)
-async def handle_rate_limit_exceeded(request, exc):
-    return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded"})
+for exc_class, (status_code, detail) in EXCEPTION_RESPONSES.items():
+    app.add_exception_handler(exc_class, _make_exception_handler(status_code, detail))
 
 # Root endpoint
 @app.get("/")
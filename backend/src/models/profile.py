@@ -18,4 +18,5 @@ class Profile(Base):
     role = Column(String, default="student", nullable=False)
 
     # Relationships
-    sessions = relationship("UserSession", back_populates="user")
+    # Sessions are removed by the database via ON DELETE CASCADE
+    sessions = relationship("UserSession", back_populates="user", cascade="all, delete", passive_deletes=True)
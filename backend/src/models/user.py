@@ -18,6 +18,7 @@ class User(Base):
     registration_date = Column(DateTime, server_default=text("(datetime('now'))"))
 
     # Relationships
-    enrollments = relationship("Enrollment", back_populates="user")
-    progress_records = relationship("UserLessonProgress", back_populates="user")
-    activity_logs = relationship("UserActivityLog", back_populates="user")
\ No newline at end of file
+    # Child rows are removed by the database via ON DELETE CASCADE
+    enrollments = relationship("Enrollment", back_populates="user", cascade="all, delete", passive_deletes=True)
+    progress_records = relationship("UserLessonProgress", back_populates="user", cascade="all, delete", passive_deletes=True)
+    activity_logs = relationship("UserActivityLog", back_populates="user", cascade="all, delete", passive_deletes=True)
\ No newline at end of file